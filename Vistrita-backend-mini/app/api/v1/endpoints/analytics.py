@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from app.core.database import get_db
+from app.core.auth import get_current_user
+from app.models.user import User
+from app.schemas.analytics import UsageSummary, UsageBreakdown
+from app.services.analytics import usage_summary, usage_breakdown
+
+router = APIRouter()
+
+@router.get("/summary", response_model=UsageSummary)
+def get_usage_summary(
+    days: int = Query(30, ge=1, le=366),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Total generations and success vs fallback rate over the last `days` days."""
+    return usage_summary(db, current_user.id, days)
+
+@router.get("/usage", response_model=UsageBreakdown)
+def get_usage_breakdown(
+    group_by: str = Query("day", pattern="^(day|category|tone)$"),
+    days: int = Query(30, ge=1, le=366),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Generations per day, category or tone over the last `days` days (read from rollups)."""
+    return {
+        "group_by": group_by,
+        "days": days,
+        "buckets": usage_breakdown(db, current_user.id, group_by, days)
+    }
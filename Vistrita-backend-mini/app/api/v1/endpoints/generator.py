@@ -7,29 +7,46 @@ from app.schemas.product import (
     GenerateFromImageResponse,
     VisionRequest,
     BulkGenerateRequest,
-    BulkGenerateResponse
+    BulkGenerateResponse,
+    GenerateVariantsRequest,
+    GenerateVariantsResponse
 )
-from app.services.generator import generate_product_description
+from app.services.generator import generate_product_description, generate_product_variants
 from app.services.vision import extract_attributes_from_image
-from app.core.database import get_db
-from sqlalchemy.orm import Session
+from app.services.results import is_fallback_result
+from app.services.log_writer import log_writer
 from app.models.user import User
 from app.models.product import ProductDescription
 from app.core.auth import get_current_user
 from fastapi import Depends
 
 from app.core.limiter import limiter
-from app.core.exceptions import ValidationError, AIProviderError
+from app.core.exceptions import ValidationError, AIProviderError, ServiceOverloadedError
+from app.core.admission import upstream
+from app.core.responses import json_response
 
 
 router = APIRouter()
 
+def _build_log(product_name: str, category: str, tone: str, result: dict, user_id: int) -> ProductDescription:
+    return ProductDescription(
+        product_name=product_name,
+        category=category,
+        tone=tone,
+        titles=result.get("titles", []),
+        description_short=result.get("description_short", ""),
+        description_long=result.get("description_long", ""),
+        bullets=result.get("bullets", []),
+        warnings=result.get("warnings", []),
+        keywords=result.get("keywords", []),
+        user_id=user_id
+    )
+
 @router.post("/generate", response_model=GenerateResponse)
 @limiter.limit("10/minute")
 async def generate_description(
     request: Request,
     generate_request: GenerateRequest,
-    db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -41,25 +58,47 @@ async def generate_description(
 
 
     try:
-        result = generate_product_description(generate_request)
-
-        db_log = ProductDescription(
-            product_name=generate_request.title,
-            category=generate_request.category,
-            tone=generate_request.tone,
-            description=result["description_long"], 
-            titles=result.get("titles", []),
-            description_short=result.get("description_short", ""),
-            description_long=result.get("description_long", ""),
-            bullets=result.get("bullets", []),
-            warnings=result.get("warnings", []),
-            keywords=result.get("keywords", []),
-            user_id=current_user.id
-        )
-        db.add(db_log)
-        db.commit()
+        result = await upstream.run(generate_product_description, generate_request, current_user.id)
+
+        # Persisted by the background log writer (group commit), off the response path
+        await log_writer.submit(_build_log(
+            generate_request.title, generate_request.category, generate_request.tone, result, current_user.id
+        ))
         
         return result
+    except ServiceOverloadedError:
+        raise
+    except Exception as e:
+        raise AIProviderError(str(e))
+
+
+@router.post("/generate/variants", response_model=GenerateVariantsResponse)
+@limiter.limit("5/minute")
+async def generate_description_variants(
+    request: Request,
+    variants_request: GenerateVariantsRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Generates several variants in several tones for one product, batched into a
+    few multi-output model calls (at most VARIANTS_PER_CALL descriptions each).
+    Results are keyed by tone; every variant is saved as its own history entry.
+    """
+    if not variants_request.title or not variants_request.category:
+        raise ValidationError("Title and Category are required.")
+
+    try:
+        results = await upstream.run(generate_product_variants, variants_request, current_user.id)
+
+        for tone, tone_results in results.items():
+            for result in tone_results:
+                await log_writer.submit(_build_log(
+                    variants_request.title, variants_request.category, tone, result, current_user.id
+                ))
+
+        return {"results": results}
+    except ServiceOverloadedError:
+        raise
     except Exception as e:
         raise AIProviderError(str(e))
 
@@ -69,78 +108,64 @@ async def generate_description(
 async def generate_from_vision(
     request: Request,
     vision_request: GenerateFromImageRequest,
-    db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     1. Extracts attributes from image.
     2. Uses those attributes to generate text description automatically.
     """
-    try:
-        # STEP 1: Extract Attributes (Vision)
-        vision_req = VisionRequest(image=vision_request.image)
-        vision_result = extract_attributes_from_image(vision_req)
-        attrs = vision_result.get("attributes", {})
+    # One upstream slot covers both model calls
+    async with upstream.slot():
+        try:
+            # STEP 1: Extract Attributes (Vision)
+            vision_req = VisionRequest(image=vision_request.image)
+            vision_result = await upstream.call(extract_attributes_from_image, vision_req)
+            attrs = vision_result.get("attributes", {})
         
-        if not attrs:
-             raise ValueError("Could not extract attributes from image.")
-
-        # STEP 2: Map Attributes to Generator Input
-        # We construct a synthetic title and features list from the visual data
-        detected_color = attrs.get("color", "Generic")
-        detected_shape = attrs.get("shape", "Product")
-        detected_material = attrs.get("material", "")
-        detected_keywords = attrs.get("keywords", [])
-
-        title = f"{detected_color} {detected_shape}" # e.g. "Red Sneaker"
-        category = attrs.get("style", "General")
-
-        # Create a temporary GenerateRequest
-        gen_request = GenerateRequest(
-            title=title,
-            category=category,
-            features=[detected_material] + detected_keywords,
-            tone=vision_request.tone,
-            image=vision_request.image
-        )
-
-        # STEP 3: Generate Text (LLM)
-        text_result = generate_product_description(gen_request)
-
-        # STEP 4: SAVE TO DB
-        db_log = ProductDescription(
-            product_name=title,
-            category=category,
-            tone=vision_request.tone,
-            description=text_result["description_long"],
-            titles=text_result.get("titles", []),
-            description_short=text_result.get("description_short", ""),
-            description_long=text_result.get("description_long", ""),
-            bullets=text_result.get("bullets", []),
-            warnings=text_result.get("warnings", []),
-            keywords=text_result.get("keywords", []),
-            user_id=current_user.id
-        )
-        db.add(db_log)
-        db.commit()
-
-        return {
-            "attributes": attrs,
-            "generated": text_result
-        }
+            if not attrs:
+                 raise ValueError("Could not extract attributes from image.")
+
+            # STEP 2: Map Attributes to Generator Input
+            # We construct a synthetic title and features list from the visual data
+            detected_color = attrs.get("color", "Generic")
+            detected_shape = attrs.get("shape", "Product")
+            detected_material = attrs.get("material", "")
+            detected_keywords = attrs.get("keywords", [])
+
+            title = f"{detected_color} {detected_shape}" # e.g. "Red Sneaker"
+            category = attrs.get("style", "General")
+
+            # Create a temporary GenerateRequest
+            gen_request = GenerateRequest(
+                title=title,
+                category=category,
+                features=[detected_material] + detected_keywords,
+                tone=vision_request.tone,
+                image=vision_request.image
+            )
 
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Composite generation failed: {str(e)}"
-        )
+            # STEP 3: Generate Text (LLM)
+            text_result = await upstream.call(generate_product_description, gen_request, current_user.id)
+
+            # STEP 4: SAVE TO DB
+            await log_writer.submit(_build_log(title, category, vision_request.tone, text_result, current_user.id))
+
+            return {
+                "attributes": attrs,
+                "generated": text_result
+            }
+
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Composite generation failed: {str(e)}"
+            )
 
 @router.post("/generate/bulk", response_model=BulkGenerateResponse)
 @limiter.limit("2/minute")
 async def generate_bulk_descriptions(
     request: Request,
     bulk_request: BulkGenerateRequest,
-    db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -151,49 +176,39 @@ async def generate_bulk_descriptions(
     successful_count = 0
     failed_count = 0
 
-    for product_req in bulk_request.products:
-        # Generate content (this handles its own exceptions and returns an error dict if needed)
-        result = generate_product_description(product_req)
+    # Products are generated one after another, so the whole run holds a single upstream slot
+    async with upstream.slot():
+        for product_req in bulk_request.products:
+            # Generate content (this handles its own exceptions and returns an error dict if needed)
+            result = await upstream.call(generate_product_description, product_req, current_user.id)
         
-        # Check if it was an error response/fallback
-        # (The service returns "titles": ["Error..."] on failure)
-        is_error = result.get("titles") and result["titles"][0].startswith("Error")
+            # Check if it was an error response/fallback
+            # (The service returns "titles": ["Error..."] on failure)
+            is_error = is_fallback_result(result)
         
-        if is_error:
-            failed_count += 1
-        else:
-            successful_count += 1
-
-        # Save to DB (only if we have a valid-ish result, though saving errors can be useful too)
-        # We will save everything that has a description_long
-        try:
-            db_log = ProductDescription(
-                product_name=product_req.title,
-                category=product_req.category,
-                tone=product_req.tone,
-                description=result["description_long"],
-                titles=result.get("titles", []),
-                description_short=result.get("description_short", ""),
-                description_long=result.get("description_long", ""),
-                bullets=result.get("bullets", []),
-                warnings=result.get("warnings", []),
-                keywords=result.get("keywords", []),
-                user_id=current_user.id
-            )
-            db.add(db_log)
-            db.commit()
-            db.refresh(db_log)
-        except Exception as e:
-            print(f"Failed to save log for {product_req.title}: {e}")
-            # we don't fail the request, just log it
+            if is_error:
+                failed_count += 1
+            else:
+                successful_count += 1
+
+            # Queue for the DB (only if we have a valid-ish result, though saving errors can be useful too)
+            # We will save everything that has a description_long
+            try:
+                await log_writer.submit(_build_log(
+                    product_req.title, product_req.category, product_req.tone, result, current_user.id
+                ))
+            except Exception as e:
+                print(f"Failed to save log for {product_req.title}: {e}")
+                # we don't fail the request, just log it
         
-        results.append(result)
+            results.append(result)
 
-    return {
+    # Results come straight from the service; skip re-validating them against BulkGenerateResponse
+    return json_response(request, {
         "results": results,
         "metrics": {
             "total": len(bulk_request.products),
             "successful": successful_count,
             "failed": failed_count
         }
-    }
\ No newline at end of file
+    })
\ No newline at end of file
@@ -1,5 +1,10 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Response, status
 from datetime import datetime
+from sqlalchemy import text
+
+from app.core.admission import upstream, upstream_health
+from app.core.database import engine
+from app.services.log_writer import log_writer
 
 router = APIRouter()
 
@@ -18,4 +23,45 @@ def health_check():
         "service": "vistrita-api",
         "version": "1.0-mini",
         "uptime": f"{uptime_seconds:.2f}s"
-    }
\ No newline at end of file
+    }
+
+def _database_status() -> dict:
+    pool = engine.pool
+    result = {
+        "status": "ok",
+        "pool": {
+            "size": getattr(pool, "size", lambda: None)(),
+            "checked_out": getattr(pool, "checkedout", lambda: None)(),
+            "overflow": getattr(pool, "overflow", lambda: None)(),
+        },
+    }
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    except Exception as e:
+        result["status"] = "down"
+        result["error"] = str(e)
+    return result
+
+@router.get("/health/ready")
+def readiness_check(response: Response):
+    """
+    Readiness check: 503 when this worker should not get new traffic
+    (upstream admission queue full or database unreachable).
+    Upstream (Gemini) health is reported but does not fail readiness, since
+    every worker shares the same provider.
+    """
+    admission = upstream.snapshot()
+    database = _database_status()
+    ready = database["status"] == "ok" and not admission["saturated"]
+    if not ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        response.headers["Retry-After"] = str(upstream.retry_after)
+
+    return {
+        "status": "ready" if ready else "unavailable",
+        "admission": admission,
+        "database": database,
+        "upstream": upstream_health.snapshot(),
+        "log_writer": {"running": log_writer.running, "queued": log_writer.qsize()},
+    }
@@ -1,15 +1,34 @@
 from typing import List
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from sqlalchemy.orm import Session
 from app.core.database import get_db
 from app.core.auth import get_current_user
+from app.core.responses import json_response
 from app.models.user import User
 from app.models.product import ProductDescription
 from app.schemas.product_log import ProductLog
 
 router = APIRouter()
 
+# Plain column selects (no ORM instances) shaped like ProductLog
+LOG_COLUMNS = [
+    ProductDescription.id,
+    ProductDescription.product_name,
+    ProductDescription.category,
+    ProductDescription.tone,
+    ProductDescription.description_long.label("description"),
+    ProductDescription.titles,
+    ProductDescription.description_short,
+    ProductDescription.description_long,
+    ProductDescription.bullets,
+    ProductDescription.warnings,
+    ProductDescription.keywords,
+    ProductDescription.created_at,
+    ProductDescription.user_id,
+]
+
 @router.get("/logs", response_model=List[ProductLog])
-def get_user_logs(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def get_user_logs(request: Request, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
     """Retrieve all product descriptions generated by the current user."""
-    return db.query(ProductDescription).filter(ProductDescription.user_id == current_user.id).order_by(ProductDescription.created_at.desc()).all()
\ No newline at end of file
+    rows = db.query(*LOG_COLUMNS).filter(ProductDescription.user_id == current_user.id).order_by(ProductDescription.created_at.desc()).all()
+    return json_response(request, [dict(row._mapping) for row in rows])
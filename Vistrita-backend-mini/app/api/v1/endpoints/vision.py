@@ -3,6 +3,8 @@ from fastapi import APIRouter, HTTPException, status, Request
 from app.schemas.product import VisionRequest, VisionResponse
 from app.services.vision import extract_attributes_from_image
 from app.core.limiter import limiter
+from app.core.admission import upstream
+from app.core.exceptions import ServiceOverloadedError
 
 
 router = APIRouter()
@@ -18,9 +20,11 @@ async def extract_image_attributes(request: Request, vision_request: VisionReque
         raise HTTPException(status_code=400, detail="Image data required")
 
     try:
-        result = extract_attributes_from_image(vision_request)
+        result = await upstream.run(extract_attributes_from_image, vision_request)
 
         return result
+    except ServiceOverloadedError:
+        raise
     except ValueError as ve:
          raise HTTPException(status_code=400, detail=str(ve))
     except Exception as e:
@@ -0,0 +1,156 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
+
+from app.core.config import settings
+from app.core.exceptions import ServiceOverloadedError
+
+
+class UpstreamHealth:
+    """Tracks the outcome and latency of recent Gemini calls (recorded by the services)."""
+
+    def __init__(self, down_after: int = 5):
+        self.down_after = down_after
+        self._lock = threading.Lock()
+        self._consecutive_failures = 0
+        self._last_error = None
+        self._last_success = None
+        self._ewma_latency = None
+
+    def call(self, fn, *args, **kwargs):
+        """Runs an upstream call, recording its latency or its failure."""
+        started = time.monotonic()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            self.record_failure(e)
+            raise
+        self.record_success(time.monotonic() - started)
+        return result
+
+    def record_success(self, latency: float):
+        with self._lock:
+            self._consecutive_failures = 0
+            self._last_success = time.monotonic()
+            self._ewma_latency = latency if self._ewma_latency is None else 0.8 * self._ewma_latency + 0.2 * latency
+
+    def record_failure(self, error: Exception):
+        with self._lock:
+            self._consecutive_failures += 1
+            self._last_error = str(error)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            if self._consecutive_failures >= self.down_after:
+                status = "down"
+            elif self._consecutive_failures:
+                status = "degraded"
+            else:
+                status = "ok"
+            return {
+                "status": status,
+                "consecutive_failures": self._consecutive_failures,
+                "last_error": self._last_error,
+                "seconds_since_success": None if self._last_success is None else round(time.monotonic() - self._last_success, 1),
+                "latency_ms": None if self._ewma_latency is None else round(self._ewma_latency * 1000, 1),
+            }
+
+
+class AdmissionController:
+    """
+    Bounds upstream (Gemini) work per worker process.
+
+    At most ``max_inflight`` requests hold a slot; up to ``max_queue`` more wait
+    in FIFO order for at most ``queue_timeout`` seconds. Anything beyond that is
+    rejected straight away with 503 + Retry-After instead of piling up. Upstream
+    calls run on a dedicated thread pool, so they never occupy the threads that
+    serve cheap sync routes such as /health and /history.
+    """
+
+    def __init__(self, max_inflight: int, max_queue: int, queue_timeout: float, retry_after: int):
+        self.max_inflight = max_inflight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self._executor = ThreadPoolExecutor(max_workers=max_inflight, thread_name_prefix="upstream")
+        self._inflight = 0
+        self._waiters = deque()
+        self.rejected = 0
+
+    @property
+    def saturated(self) -> bool:
+        return self._inflight >= self.max_inflight and len(self._waiters) >= self.max_queue
+
+    def _reject(self, reason: str):
+        self.rejected += 1
+        return ServiceOverloadedError(reason, retry_after=self.retry_after)
+
+    async def _acquire(self):
+        if self._inflight < self.max_inflight and not self._waiters:
+            self._inflight += 1
+            return
+        if len(self._waiters) >= self.max_queue:
+            raise self._reject("Too many requests waiting for the AI provider")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            # _release() hands its slot over directly by resolving the future
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise self._reject("Timed out waiting for an AI provider slot")
+        except BaseException:
+            if waiter.done() and not waiter.cancelled():
+                self._release()  # got the slot just as we were cancelled
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def _release(self):
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._inflight -= 1
+
+    @asynccontextmanager
+    async def slot(self):
+        """Holds one upstream slot for the duration of the block (e.g. a whole bulk run)."""
+        await self._acquire()
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def call(self, fn, *args):
+        """Runs a blocking upstream call on the upstream pool; use inside ``slot()``."""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, partial(fn, *args))
+
+    async def run(self, fn, *args):
+        async with self.slot():
+            return await self.call(fn, *args)
+
+    def snapshot(self) -> dict:
+        return {
+            "saturated": self.saturated,
+            "inflight": self._inflight,
+            "max_inflight": self.max_inflight,
+            "waiting": len(self._waiters),
+            "max_queue": self.max_queue,
+            "rejected_total": self.rejected,
+        }
+
+
+upstream = AdmissionController(
+    max_inflight=settings.UPSTREAM_MAX_INFLIGHT,
+    max_queue=settings.UPSTREAM_MAX_QUEUE,
+    queue_timeout=settings.UPSTREAM_QUEUE_TIMEOUT,
+    retry_after=settings.UPSTREAM_RETRY_AFTER,
+)
+upstream_health = UpstreamHealth()
@@ -11,4 +11,38 @@ class Settings:
     VISTRITA_API_KEY: str = os.getenv("VISTRITA_API_KEY", "")
     DATABASE_URL: str = os.getenv("DATABASE_URL", "postgresql://vistrita_user:vistrita_pass@db:5432/vistrita_db")
 
+    # Similar-product retrieval (reuse / few-shot from prior generations)
+    SIMILARITY_INDEX_DIR: str = os.getenv("SIMILARITY_INDEX_DIR", "data/similarity_index")
+    SIMILARITY_DIM: int = int(os.getenv("SIMILARITY_DIM", "1024"))
+    SIMILARITY_TITLE_REUSE_THRESHOLD: float = float(os.getenv("SIMILARITY_TITLE_REUSE_THRESHOLD", "0.5"))
+    SIMILARITY_FEWSHOT_THRESHOLD: float = float(os.getenv("SIMILARITY_FEWSHOT_THRESHOLD", "0.5"))
+    SIMILARITY_FEWSHOT_K: int = int(os.getenv("SIMILARITY_FEWSHOT_K", "2"))
+
+    # /generate/variants: max descriptions requested from Gemini in one call
+    VARIANTS_PER_CALL: int = int(os.getenv("VARIANTS_PER_CALL", "4"))
+
+    # Write-behind persistence of generation logs
+    LOG_WRITER_BATCH_SIZE: int = int(os.getenv("LOG_WRITER_BATCH_SIZE", "100"))
+    LOG_WRITER_FLUSH_INTERVAL: float = float(os.getenv("LOG_WRITER_FLUSH_INTERVAL", "0.5"))
+    LOG_WRITER_MAX_QUEUE: int = int(os.getenv("LOG_WRITER_MAX_QUEUE", "1000"))
+    LOG_WRITER_MAX_RETRIES: int = int(os.getenv("LOG_WRITER_MAX_RETRIES", "3"))
+    LOG_WRITER_RETRY_BACKOFF: float = float(os.getenv("LOG_WRITER_RETRY_BACKOFF", "0.5"))
+    LOG_WRITER_MAX_BACKOFF: float = float(os.getenv("LOG_WRITER_MAX_BACKOFF", "30"))
+
+    # product_descriptions partitioning / retention
+    PARTITION_MONTHS_AHEAD: int = int(os.getenv("PARTITION_MONTHS_AHEAD", "3"))
+    RETENTION_MONTHS: int = int(os.getenv("RETENTION_MONTHS", "12"))
+    ARCHIVE_DIR: str = os.getenv("ARCHIVE_DIR", "data/archive")
+
+    # Response encoding for large payloads (history, bulk)
+    RESPONSE_COMPRESS_MIN_BYTES: int = int(os.getenv("RESPONSE_COMPRESS_MIN_BYTES", "1024"))
+    RESPONSE_GZIP_LEVEL: int = int(os.getenv("RESPONSE_GZIP_LEVEL", "6"))
+    RESPONSE_BROTLI_QUALITY: int = int(os.getenv("RESPONSE_BROTLI_QUALITY", "4"))
+
+    # Admission control for upstream (Gemini) bound endpoints, per worker
+    UPSTREAM_MAX_INFLIGHT: int = int(os.getenv("UPSTREAM_MAX_INFLIGHT", "8"))
+    UPSTREAM_MAX_QUEUE: int = int(os.getenv("UPSTREAM_MAX_QUEUE", "16"))
+    UPSTREAM_QUEUE_TIMEOUT: float = float(os.getenv("UPSTREAM_QUEUE_TIMEOUT", "5"))
+    UPSTREAM_RETRY_AFTER: int = int(os.getenv("UPSTREAM_RETRY_AFTER", "5"))
+
 settings = Settings()
\ No newline at end of file
@@ -2,8 +2,8 @@ from fastapi import HTTPException, status
 
 class VistritaException(HTTPException):
     """Base exception for Vistrita API"""
-    def __init__(self, detail: str, status_code: int = status.HTTP_500_INTERNAL_SERVER_ERROR):
-        super().__init__(status_code=status_code, detail=detail)
+    def __init__(self, detail: str, status_code: int = status.HTTP_500_INTERNAL_SERVER_ERROR, headers: dict = None):
+        super().__init__(status_code=status_code, detail=detail, headers=headers)
 
 class AIProviderError(VistritaException):
     """Errors related to Gemini/AI processing"""
@@ -19,3 +19,12 @@ class ResourceNotFoundError(VistritaException):
     """Errors when a resource is not found"""
     def __init__(self, detail: str = "Resource not found"):
         super().__init__(detail=f"NOT_FOUND: {detail}", status_code=status.HTTP_404_NOT_FOUND)
+
+class ServiceOverloadedError(VistritaException):
+    """Errors when upstream capacity is exhausted (load shedding)"""
+    def __init__(self, detail: str = "Service is at capacity", retry_after: int = 5):
+        super().__init__(
+            detail=f"OVERLOADED: {detail}",
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            headers={"Retry-After": str(retry_after)},
+        )
@@ -0,0 +1,51 @@
+import gzip
+
+import orjson
+from fastapi import Request
+from fastapi.responses import Response
+
+from app.core.config import settings
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; fall back to gzip only
+    brotli = None
+
+
+def _accepted_encodings(request: Request) -> set:
+    """Parses Accept-Encoding, dropping anything the client refused with q=0."""
+    accepted = set()
+    for part in request.headers.get("accept-encoding", "").split(","):
+        coding, *params = [p.strip() for p in part.split(";")]
+        q = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding and q > 0:
+            accepted.add(coding.lower())
+    return accepted
+
+
+def json_response(request: Request, content, status_code: int = 200) -> Response:
+    """
+    Fast path for large, trusted payloads we built ourselves: serialize once with
+    orjson (returning a Response skips FastAPI's jsonable_encoder + response_model
+    pass) and compress with brotli/gzip when the body is big enough to be worth it.
+    """
+    body = orjson.dumps(content)
+    headers = {"Vary": "Accept-Encoding"}
+
+    if len(body) >= settings.RESPONSE_COMPRESS_MIN_BYTES:
+        accepted = _accepted_encodings(request)
+        if brotli is not None and "br" in accepted:
+            body = brotli.compress(body, quality=settings.RESPONSE_BROTLI_QUALITY)
+            headers["Content-Encoding"] = "br"
+        elif "gzip" in accepted:
+            body = gzip.compress(body, compresslevel=settings.RESPONSE_GZIP_LEVEL)
+            headers["Content-Encoding"] = "gzip"
+
+    return Response(content=body, status_code=status_code, headers=headers, media_type="application/json")
@@ -1,24 +1,37 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.utils import get_openapi
 from app.api.v1.router import api_router
 from app.core.database import engine, Base
-from app.models import user, product # Import models to ensure they are registered
+from app.models import user, product, analytics # Import models to ensure they are registered
 from app.core.limiter import limiter
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from slowapi.middleware import SlowAPIMiddleware
+from app.services.log_writer import log_writer
+from app.services.retention import ensure_partitions
 
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
+ensure_partitions(engine)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    log_writer.start()
+    yield
+    # Drain queued generation logs before the process exits (bounded, off the event loop)
+    await run_in_threadpool(log_writer.stop)
 
 app = FastAPI(
     title="Vistrita API",
     description="Backend for the Vistrita Product Description Generator",
     version="1.0-mini",
     docs_url="/docs", # Swagger UI
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # Add Rate Limiting
@@ -1,2 +1,3 @@
 from .user import User
 from .product import ProductDescription
+from .analytics import UsageDailyRollup
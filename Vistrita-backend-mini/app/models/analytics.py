@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, String, Date, ForeignKey
+from app.core.database import Base
+
+class UsageDailyRollup(Base):
+    """
+    Per-user daily generation counts by category and tone. Incremented in the
+    same transaction that writes the product_descriptions rows
+    (see app.services.analytics.record_usage).
+    """
+    __tablename__ = "usage_daily_rollups"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    category = Column(String, primary_key=True)
+    tone = Column(String, primary_key=True)
+
+    generations = Column(Integer, nullable=False, default=0)
+    successes = Column(Integer, nullable=False, default=0)
+    fallbacks = Column(Integer, nullable=False, default=0)
@@ -1,23 +1,38 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON, Index
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
 from app.core.database import Base
 
+# JSONB on Postgres (binary, no re-parse on read); plain JSON on other backends
+JSONType = JSON().with_variant(JSONB(), "postgresql")
+
 class ProductDescription(Base):
     __tablename__ = "product_descriptions"
+    __table_args__ = (
+        # Serves the history query: WHERE user_id = ? ORDER BY created_at DESC
+        Index("ix_product_descriptions_user_created", "user_id", "created_at"),
+        # Monthly partitions are created/archived by app.services.retention
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+    # Partitioned tables need the partition key in the primary key
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    created_at = Column(DateTime(timezone=True), primary_key=True, server_default=func.now())
 
-    id = Column(Integer, primary_key=True, index=True)
-    product_name = Column(String, index=True)
-    category = Column(String, index=True)
+    product_name = Column(String)
+    category = Column(String)
     tone = Column(String)
-    description = Column(Text) # Keeping for backward compat or just as general desc
-    
-    # New Fields
-    titles = Column(JSON, default=[]) 
+
+    titles = Column(JSONType, default=[])
     description_short = Column(Text, default="")
     description_long = Column(Text, default="")
-    bullets = Column(JSON, default=[])
-    warnings = Column(JSON, default=[])
-    keywords = Column(JSON, default=[])
-    
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    user_id = Column(Integer, ForeignKey("users.id"))
\ No newline at end of file
+    bullets = Column(JSONType, default=[])
+    warnings = Column(JSONType, default=[])
+    keywords = Column(JSONType, default=[])
+
+    user_id = Column(Integer, ForeignKey("users.id"))
+
+    @property
+    def description(self):
+        # Used to be a separate column holding a copy of description_long
+        return self.description_long
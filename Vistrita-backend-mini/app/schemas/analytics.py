@@ -0,0 +1,20 @@
+from pydantic import BaseModel
+from typing import List
+
+class UsageStats(BaseModel):
+    generations: int
+    successes: int
+    fallbacks: int
+    success_rate: float
+    fallback_rate: float
+
+class UsageSummary(UsageStats):
+    days: int
+
+class UsageBucket(UsageStats):
+    key: str
+
+class UsageBreakdown(BaseModel):
+    group_by: str
+    days: int
+    buckets: List[UsageBucket]
@@ -1,12 +1,15 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Annotated, Dict, List, Optional
+
+TONE_PATTERN = "^(neutral|formal|playful|luxury|minimalist|Professional|Casual|Technical|Luxury|Playful|Minimalist)$"
 
 class GenerateRequest(BaseModel):
     title: str = Field(..., example="Wireless Noise Cancelling Headphones")
     category: str = Field(..., example="Electronics")
     features: List[str] = Field(..., example=["Active Noise Cancellation", "20h Battery", "Bluetooth 5.0"], min_items=1)
-    tone: str = Field("neutral", pattern="^(neutral|formal|playful|luxury|minimalist|Professional|Casual|Technical|Luxury|Playful|Minimalist)$", example="luxury")
+    tone: str = Field("neutral", pattern=TONE_PATTERN, example="luxury")
     image: Optional[str] = Field(None, description="Base64 encoded image string")
+    reuse: bool = Field(True, description="Allow returning adapted copy from an earlier generation of a variant of this product; false always calls the model")
 
 class VisionRequest(BaseModel):
     image: str = Field(..., description="Base64 encoded image string")
@@ -35,4 +38,14 @@ class BulkGenerateRequest(BaseModel):
 
 class BulkGenerateResponse(BaseModel):
     results: List[GenerateResponse]
-    metrics: dict = Field(..., example={"total": 10, "successful": 9, "failed": 1})
\ No newline at end of file
+    metrics: dict = Field(..., example={"total": 10, "successful": 9, "failed": 1})
+
+class GenerateVariantsRequest(BaseModel):
+    title: str = Field(..., example="Wireless Noise Cancelling Headphones")
+    category: str = Field(..., example="Electronics")
+    features: List[str] = Field(..., example=["Active Noise Cancellation", "20h Battery", "Bluetooth 5.0"], min_items=1)
+    tones: List[Annotated[str, Field(pattern=TONE_PATTERN)]] = Field(..., example=["neutral", "luxury", "playful"], min_length=1, max_length=5)
+    variants: int = Field(1, ge=1, le=3, description="Variants to generate per tone")
+
+class GenerateVariantsResponse(BaseModel):
+    results: Dict[str, List[GenerateResponse]] = Field(..., description="Generated variants keyed by tone")
\ No newline at end of file
@@ -0,0 +1,217 @@
+"""
+Usage analytics rollups.
+
+``usage_daily_rollups`` holds one row per (user, day, category, tone) with
+generation / success / fallback counters. Rows are incremented as generation
+logs are written (``record_usage`` runs inside the log writer's transaction),
+and the /analytics API reads only from this table.
+
+Writers hold a shared transaction-level advisory lock (``ROLLUP_LOCK_KEY``)
+before inserting log rows; the backfill takes it exclusively while it resets
+the table and snapshots the highest id, so every row is counted exactly once
+(by the scan if it was committed before the snapshot, by its writer otherwise)
+and the API can keep running.
+
+Rebuild from existing history (days before the oldest live row, i.e.
+archived months, are left untouched):
+    python -m app.services.analytics backfill [--chunk-size 5000]
+"""
+import argparse
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import func, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from app.models.analytics import UsageDailyRollup
+from app.models.product import ProductDescription
+from app.services.results import is_fallback_result
+
+RollupKey = Tuple[int, date, str, str]
+
+ROLLUP_LOCK_KEY = 0x56495354  # arbitrary app-wide id for pg_advisory_xact_lock
+
+GROUP_COLUMNS = {
+    "day": UsageDailyRollup.day,
+    "category": UsageDailyRollup.category,
+    "tone": UsageDailyRollup.tone,
+}
+
+
+def _utc_day(created_at: Optional[datetime]) -> date:
+    if created_at is None:
+        return datetime.now(timezone.utc).date()
+    if created_at.tzinfo is None:
+        return created_at.date()  # naive timestamps are stored as UTC
+    return created_at.astimezone(timezone.utc).date()
+
+
+def _add(counts, user_id, created_at, category, tone, titles):
+    key = (user_id, _utc_day(created_at), category or "", tone or "")
+    fallback = is_fallback_result({"titles": titles})
+    counts[key][0] += 1
+    counts[key][1] += 0 if fallback else 1
+    counts[key][2] += 1 if fallback else 0
+
+
+def aggregate(records: Iterable[ProductDescription]) -> Dict[RollupKey, list]:
+    """Collapses log rows into ``{key: [generations, successes, fallbacks]}``."""
+    counts = defaultdict(lambda: [0, 0, 0])
+    for r in records:
+        _add(counts, r.user_id, r.created_at, r.category, r.tone, r.titles)
+    return counts
+
+
+def apply_increments(db: Session, counts: Dict[RollupKey, list]):
+    """Upserts counter increments; the caller owns the transaction."""
+    if not counts:
+        return
+
+    # Sorted so concurrent writers lock rollup rows in the same order
+    rows = [
+        {
+            "user_id": user_id, "day": day, "category": category, "tone": tone,
+            "generations": g, "successes": s, "fallbacks": f,
+        }
+        for (user_id, day, category, tone), (g, s, f) in sorted(counts.items())
+    ]
+    stmt = insert(UsageDailyRollup).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id", "day", "category", "tone"],
+        set_={
+            "generations": UsageDailyRollup.generations + stmt.excluded.generations,
+            "successes": UsageDailyRollup.successes + stmt.excluded.successes,
+            "fallbacks": UsageDailyRollup.fallbacks + stmt.excluded.fallbacks,
+        },
+    )
+    db.execute(stmt)
+
+
+def lock_rollups(db: Session, shared: bool = True):
+    """Takes the rollup advisory lock until the end of the current transaction."""
+    fn = "pg_advisory_xact_lock_shared" if shared else "pg_advisory_xact_lock"
+    db.execute(text(f"SELECT {fn}(:key)"), {"key": ROLLUP_LOCK_KEY})
+
+
+def record_usage(db: Session, records):
+    apply_increments(db, aggregate(records))
+
+
+def backfill(chunk_size: int = 5000, session_factory=SessionLocal) -> int:
+    """
+    Rebuilds the rollups from product_descriptions in id-ordered chunks, one
+    transaction per chunk. The reset and the max-id snapshot run under the
+    exclusive rollup lock; rows written after it are counted by the log
+    writer, so only ids up to that maximum are scanned.
+
+    Only days from the oldest row still in product_descriptions onwards are
+    rebuilt: earlier rollups cover months the retention job has archived
+    and are kept as they are.
+    Returns the number of rows processed.
+    """
+    db = session_factory()
+    try:
+        # Waits for in-flight log writes to commit and holds new ones off until the snapshot commits
+        lock_rollups(db, shared=False)
+        oldest, max_id = db.query(func.min(ProductDescription.created_at), func.max(ProductDescription.id)).one()
+        if oldest is None:
+            db.commit()
+            print("product_descriptions is empty; nothing to rebuild")
+            return 0
+        since = _utc_day(oldest)
+        db.query(UsageDailyRollup).filter(UsageDailyRollup.day >= since).delete()
+        db.commit()
+        print(f"Rebuilding rollups from {since} (earlier days are kept)")
+
+        processed, last_id = 0, 0
+        while last_id < max_id:
+            chunk = (
+                db.query(
+                    ProductDescription.id,
+                    ProductDescription.user_id,
+                    ProductDescription.created_at,
+                    ProductDescription.category,
+                    ProductDescription.tone,
+                    ProductDescription.titles,
+                )
+                .filter(ProductDescription.id > last_id, ProductDescription.id <= max_id)
+                .order_by(ProductDescription.id)
+                .limit(chunk_size)
+                .all()
+            )
+            if not chunk:
+                break
+            counts = defaultdict(lambda: [0, 0, 0])
+            for row in chunk:
+                _add(counts, row.user_id, row.created_at, row.category, row.tone, row.titles)
+            apply_increments(db, counts)
+            db.commit()
+
+            processed += len(chunk)
+            last_id = chunk[-1].id
+            print(f"Backfilled {processed} rows (id <= {last_id} of {max_id})")
+        return processed
+    finally:
+        db.close()
+
+
+def _filters(user_id: int, days: int):
+    since = datetime.now(timezone.utc).date() - timedelta(days=days - 1)
+    return [UsageDailyRollup.user_id == user_id, UsageDailyRollup.day >= since]
+
+
+def _with_rates(row) -> dict:
+    generations, successes, fallbacks = row.generations or 0, row.successes or 0, row.fallbacks or 0
+    return {
+        "generations": generations,
+        "successes": successes,
+        "fallbacks": fallbacks,
+        "success_rate": successes / generations if generations else 0.0,
+        "fallback_rate": fallbacks / generations if generations else 0.0,
+    }
+
+
+def _sums():
+    return (
+        func.sum(UsageDailyRollup.generations).label("generations"),
+        func.sum(UsageDailyRollup.successes).label("successes"),
+        func.sum(UsageDailyRollup.fallbacks).label("fallbacks"),
+    )
+
+
+def usage_summary(db: Session, user_id: int, days: int) -> dict:
+    row = db.query(*_sums()).filter(*_filters(user_id, days)).one()
+    return {"days": days, **_with_rates(row)}
+
+
+def usage_breakdown(db: Session, user_id: int, group_by: str, days: int) -> list:
+    column = GROUP_COLUMNS[group_by]
+    rows = (
+        db.query(column.label("key"), *_sums())
+        .filter(*_filters(user_id, days))
+        .group_by(column)
+        .order_by(column)
+        .all()
+    )
+    return [{"key": str(row.key), **_with_rates(row)} for row in rows]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Usage analytics maintenance.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    backfill_cmd = commands.add_parser(
+        "backfill",
+        help="rebuild rollups from product_descriptions; days before its oldest row (archived months) are kept",
+    )
+    backfill_cmd.add_argument("--chunk-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    if args.command == "backfill":
+        backfill(chunk_size=args.chunk_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,48 +2,151 @@ from google import genai
 from google.genai import types
 import json
 import re
+from typing import Optional
 from app.core.config import settings
-from app.schemas.product import GenerateRequest
+from app.core.admission import upstream_health
+from app.schemas.product import GenerateRequest, GenerateVariantsRequest
+from app.services.similarity import similarity_index, adapt_result, same_inputs, title_similarity
 
 client = genai.Client(api_key=settings.GOOGLE_API_KEY)
 
-def generate_product_description(data: GenerateRequest) -> dict:
-    """
-    Generate product description content using Gemini (Gen AI) SDK with JSON structured output.
-    Returns a dict matching the expected schema (titles, description_short, etc.)
-    """
-    schema = {
-        "type": "object",
-        "properties": {
-            "titles": { "type": "array", "items": { "type": "string" } },
-            "description_short": { "type": "string" },
-            "description_long": { "type": "string" },
-            "bullets": { "type": "array", "items": { "type": "string" } },
-            "warnings": { "type": "array", "items": { "type": "string" } },
-            "keywords": { "type": "array", "items": { "type": "string" } }
-        },
-        "required": ["titles", "description_short", "description_long", "bullets", "warnings", "keywords"]
+PRODUCT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "titles": { "type": "array", "items": { "type": "string" } },
+        "description_short": { "type": "string" },
+        "description_long": { "type": "string" },
+        "bullets": { "type": "array", "items": { "type": "string" } },
+        "warnings": { "type": "array", "items": { "type": "string" } },
+        "keywords": { "type": "array", "items": { "type": "string" } }
+    },
+    "required": ["titles", "description_short", "description_long", "bullets", "warnings", "keywords"]
+}
+
+def _few_shot_block(matches) -> str:
+    """Formats close prior generations as style examples for the prompt."""
+    if not matches:
+        return ""
+    examples = [
+        {
+            "title": m.entry["title"],
+            "category": m.entry["category"],
+            "tone": m.entry["tone"],
+            "output": {
+                "titles": m.entry["result"].get("titles", [])[:1],
+                "description_short": m.entry["result"].get("description_short", ""),
+                "bullets": m.entry["result"].get("bullets", []),
+            },
+        }
+        for m in matches
+    ]
+    return f"""
+Here is copy we previously wrote for similar products. Keep the same quality and
+structure, but write fresh copy for THIS product:
+
+{json.dumps(examples, indent=2)}
+"""
+
+def _features_line(data) -> str:
+    return ", ".join(data.features) if data.features else "None"
+
+def _parse_json(json_str: str) -> dict:
+    # Robust JSON extraction using regex
+    match = re.search(r'(\{.*\})', json_str, re.DOTALL)
+    if match:
+        json_str = match.group(1)
+    return json.loads(json_str.strip())
+
+def _validate_result(result: dict):
+    if not isinstance(result, dict):
+        raise ValueError("Generated JSON is not an object")
+    for key in PRODUCT_SCHEMA["required"]:
+        if key not in result:
+            raise ValueError(f"Missing key in generated JSON: {key}")
+
+def _check_complete(response):
+    # A response cut off at max_output_tokens is invalid or partial JSON; fail loudly
+    candidates = getattr(response, "candidates", None) or []
+    if candidates and candidates[0].finish_reason == types.FinishReason.MAX_TOKENS:
+        raise ValueError("Generated content was truncated (MAX_TOKENS)")
+
+def _fallback_result(e: Exception) -> dict:
+    return {
+        "titles": ["Error generating titles"],
+        "description_short": "Could not generate content.",
+        "description_long": f"System Error: {str(e)}",
+        "bullets": [],
+        "keywords": [],
+        "warnings": ["Please check API Key, model name, schema validity, or Internet Connection"]
     }
 
-    prompt = f"""
+def build_prompt(data: GenerateRequest, examples=()) -> str:
+    return f"""
 You are an expert e-commerce copywriter.
 
 Generate product description content using:
 
 - Title: {data.title}
 - Category: {data.category}
-- Key Features: {", ".join(data.features) if data.features else "None"}
+- Key Features: {_features_line(data)}
 - Tone: {data.tone}
-
+{_few_shot_block(examples)}
 Return ONLY valid JSON following the following schema:
 
-{json.dumps(schema, indent=2)}
+{json.dumps(PRODUCT_SCHEMA, indent=2)}
 
 Output JSON ONLY.
 """
 
+def _similar(data: GenerateRequest, user_id: Optional[int]):
+    # The index is an optimisation: if it can't be read, generate without it
+    try:
+        return similarity_index.search([data], k=settings.SIMILARITY_FEWSHOT_K, user_id=user_id)[0]
+    except Exception as e:
+        print("Similarity lookup failed:", e)
+        return []
+
+def _reusable_result(matches, data: GenerateRequest):
+    """
+    Adapts the match with the closest title, provided it had the same category,
+    tone and features and its title overlaps enough (e.g. "Red Sneaker" vs
+    "Crimson Sneaker"). The combined product vector is not used here: with the
+    other inputs equal it mostly measures how many features there are.
+    """
+    candidates = [m for m in matches if same_inputs(m.entry, data)]
+    if not candidates:
+        return None
+    best = max(candidates, key=lambda m: title_similarity(m.entry["title"], data.title))
+    if title_similarity(best.entry["title"], data.title) < settings.SIMILARITY_TITLE_REUSE_THRESHOLD:
+        return None
+    return adapt_result(best, data)
+
+def generate_product_description(data: GenerateRequest, user_id: Optional[int] = None) -> dict:
+    """
+    Generate product description content using Gemini (Gen AI) SDK with JSON structured output.
+    Returns a dict matching the expected schema (titles, description_short, etc.)
+
+    Unless `data.reuse` is false, a prior generation by the same user for a
+    variant of this product (same category, tone and features, closely matching
+    title) is adapted and returned without calling Gemini; similar products are
+    passed as few-shot examples.
+    """
+    matches = _similar(data, user_id)
+    if data.reuse:
+        try:
+            reused = _reusable_result(matches, data)
+        except Exception as e:
+            print("Similarity reuse failed:", e)
+            reused = None
+        if reused is not None:
+            return reused
+    examples = [m for m in matches if m.score >= settings.SIMILARITY_FEWSHOT_THRESHOLD]
+
+    schema = PRODUCT_SCHEMA
+    prompt = build_prompt(data, examples)
+
     try:
-        response = client.models.generate_content(
+        response = upstream_health.call(client.models.generate_content,
             model=settings.GEMINI_MODEL,   # or latest valid model, e.g. gemini-2.5-flash
             contents=prompt,
             config=types.GenerateContentConfig(
@@ -53,29 +156,111 @@ Output JSON ONLY.
                 max_output_tokens=2048
             )
         )
-        json_str = response.text
-        
-        # Robust JSON extraction using regex
-        match = re.search(r'(\{.*\})', json_str, re.DOTALL)
-        if match:
-            json_str = match.group(1)
-        
-        result = json.loads(json_str.strip())
+        _check_complete(response)
+        result = _parse_json(response.text)
 
         # Optional: validate that required keys are present
-        for key in ["titles", "description_short", "description_long", "bullets", "warnings", "keywords"]:
-            if key not in result:
-                raise ValueError(f"Missing key in generated JSON: {key}")
+        _validate_result(result)
+
+        try:
+            similarity_index.add(data, result, user_id)
+        except Exception as e:
+            print("Similarity index update failed:", e)
 
         return result
 
     except Exception as e:
         print("Gemini Error:", e)
-        return {
-            "titles": ["Error generating titles"],
-            "description_short": "Could not generate content.",
-            "description_long": f"System Error: {str(e)}",
-            "bullets": [],
-            "keywords": [],
-            "warnings": ["Please check API Key, model name, schema validity, or Internet Connection"]
-        }
+        return _fallback_result(e)
+
+def _variants_schema(tones, variants: int) -> dict:
+    # One array of `variants` product objects per tone, all in a single response
+    variant_list = {"type": "array", "items": PRODUCT_SCHEMA, "minItems": variants, "maxItems": variants}
+    return {
+        "type": "object",
+        "properties": {tone: variant_list for tone in tones},
+        "required": list(tones)
+    }
+
+def build_variants_prompt(data: GenerateVariantsRequest, examples=(), tones=None) -> str:
+    tones = list(dict.fromkeys(tones or data.tones))
+    return f"""
+You are an expert e-commerce copywriter.
+
+Generate product description content using:
+
+- Title: {data.title}
+- Category: {data.category}
+- Key Features: {_features_line(data)}
+{_few_shot_block(examples)}
+Write {data.variants} distinct variant(s) in EACH of these tones: {", ".join(tones)}.
+Variants of the same tone must differ in wording and angle, not just punctuation.
+
+Return ONLY valid JSON: an object with one key per tone, each holding an array of
+{data.variants} objects that follow this schema:
+
+{json.dumps(PRODUCT_SCHEMA, indent=2)}
+
+Output JSON ONLY.
+"""
+
+def _generate_variant_batch(data: GenerateVariantsRequest, tones, examples) -> dict:
+    response = upstream_health.call(client.models.generate_content,
+        model=settings.GEMINI_MODEL,
+        contents=build_variants_prompt(data, examples, tones),
+        config=types.GenerateContentConfig(
+            response_mime_type="application/json",
+            response_schema=_variants_schema(tones, data.variants),
+            temperature=0.7,          # higher than single-shot so variants actually differ
+            max_output_tokens=2048 * len(tones) * data.variants
+        )
+    )
+    _check_complete(response)
+    return _parse_json(response.text)
+
+def generate_product_variants(data: GenerateVariantsRequest, user_id: Optional[int] = None) -> dict:
+    """
+    Generates `data.variants` descriptions for every tone in `data.tones` with
+    multi-output Gemini requests: tones are grouped so that no request asks for
+    more than VARIANTS_PER_CALL descriptions (each gets the same 2048-token
+    output budget as a single /generate call).
+    Returns {tone: [result, ...]}; tones the model failed to fill get fallback results.
+    """
+    tones = list(dict.fromkeys(data.tones))
+    base = GenerateRequest(title=data.title, category=data.category, features=data.features)
+    matches = _similar(base, user_id)
+    examples = [m for m in matches if m.score >= settings.SIMILARITY_FEWSHOT_THRESHOLD]
+
+    tones_per_call = max(1, settings.VARIANTS_PER_CALL // data.variants)
+    generated, errors = {}, {}
+    for i in range(0, len(tones), tones_per_call):
+        batch = tones[i:i + tones_per_call]
+        try:
+            generated.update(_generate_variant_batch(data, batch, examples))
+        except Exception as e:
+            print("Gemini Error:", e)
+            errors.update({tone: e for tone in batch})
+
+    results, to_index = {}, []
+    for tone in tones:
+        if tone in errors:
+            results[tone] = [_fallback_result(errors[tone]) for _ in range(data.variants)]
+            continue
+        results[tone] = []
+        for result in (generated.get(tone) or [])[:data.variants]:
+            try:
+                _validate_result(result)
+            except ValueError as e:
+                result = _fallback_result(e)
+            else:
+                to_index.append((base.model_copy(update={"tone": tone}), result))
+            results[tone].append(result)
+        while len(results[tone]) < data.variants:
+            results[tone].append(_fallback_result(ValueError(f"Missing variants for tone: {tone}")))
+
+    try:
+        similarity_index.add_many(to_index, user_id)
+    except Exception as e:
+        print("Similarity index update failed:", e)
+
+    return results
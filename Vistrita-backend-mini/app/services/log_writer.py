@@ -0,0 +1,207 @@
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.exc import DataError, IntegrityError
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.services.analytics import lock_rollups, record_usage
+
+_STOP = object()
+
+# Failures caused by the rows themselves; retrying the same batch can't succeed
+_ROW_ERRORS = (IntegrityError, DataError)
+
+
+class LogWriter:
+    """
+    Write-behind persistence for ``ProductDescription`` rows.
+
+    Endpoints ``await submit()`` records and return immediately; a background
+    thread commits them in groups of up to ``batch_size`` rows or every
+    ``flush_interval`` seconds, whichever comes first. When the queue is full the
+    caller waits up to ``put_timeout`` seconds and then writes the record itself
+    (off the event loop), so a stalled database slows producers down instead of
+    growing memory or dropping rows.
+
+    A batch rejected because of its data (constraint violation, bad value) is
+    split in halves until the offending rows are isolated; only those are
+    dropped. Any other failure, such as the database being unreachable, keeps
+    the batch and retries it with exponential backoff capped at ``max_backoff``:
+    indefinitely on the writer thread, ``max_retries`` times for inline writes.
+    """
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        batch_size: int = 100,
+        flush_interval: float = 0.5,
+        max_queue: int = 1000,
+        put_timeout: float = 1.0,
+        max_retries: int = 3,
+        retry_backoff: float = 0.5,
+        max_backoff: float = 30.0,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.max_backoff = max_backoff
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._give_up_at = None  # set by stop(): stop retrying after this monotonic time
+        self._stats_lock = threading.Lock()
+        self.stats = {"rows": 0, "transactions": 0, "failed_rows": 0, "inline_writes": 0}
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._give_up_at = None
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 30.0):
+        """
+        Flushes everything already enqueued, then stops the writer thread,
+        spending at most ``timeout`` seconds in total. If the database is still
+        failing by then, the writer stops retrying and the rest is lost.
+        """
+        if not self.running:
+            return
+        self._give_up_at = time.monotonic() + timeout
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(max(0.0, self._give_up_at - time.monotonic()))
+        if self._thread.is_alive():
+            print(f"Log writer did not drain within {timeout}s; {self.qsize()} generation logs were not written")
+        self._thread = None
+
+    @staticmethod
+    def _stamp(record):
+        if record.created_at is None:
+            # Stamp now rather than at flush time so the row reflects the request
+            record.created_at = datetime.now(timezone.utc)
+
+    async def submit(self, record):
+        """Event-loop friendly ``enqueue``: never blocks the loop on a full queue or a DB write."""
+        self._stamp(record)
+        if self.running:
+            try:
+                self._queue.put_nowait(record)
+                return
+            except queue.Full:
+                pass
+        await run_in_threadpool(self.enqueue, record)
+
+    def enqueue(self, record):
+        """Blocking variant for worker threads and scripts."""
+        self._stamp(record)
+        if not self.running:
+            self._flush([record])
+            return
+        try:
+            self._queue.put(record, timeout=self.put_timeout)
+        except queue.Full:
+            self._bump("inline_writes")
+            self._flush([record])
+
+    def qsize(self) -> int:
+        return self._queue.qsize()
+
+    def _run(self):
+        batch = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                self._flush(batch, persistent=True)
+                return
+            if item is not None:
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+
+            if batch and (len(batch) >= self.batch_size or time.monotonic() >= deadline):
+                self._flush(batch, persistent=True)
+                batch = []
+                deadline = None
+
+    def _flush(self, batch, persistent: bool = False):
+        """Commits ``batch``; ``persistent`` retries outages until they clear (writer thread only)."""
+        attempt = 0
+        while batch:
+            error = self._write(batch)
+            if error is None:
+                return
+
+            if isinstance(error, _ROW_ERRORS):
+                if len(batch) == 1:
+                    self._bump("failed_rows")
+                    print(f"Dropped generation log for {batch[0].product_name!r}: {error}")
+                    return
+                mid = len(batch) // 2
+                self._flush(batch[:mid], persistent)
+                self._flush(batch[mid:], persistent)
+                return
+
+            attempt += 1
+            remaining = None if self._give_up_at is None else self._give_up_at - time.monotonic()
+            if (not persistent and attempt > self.max_retries) or (remaining is not None and remaining <= 0):
+                self._bump("failed_rows", len(batch))
+                print(f"Gave up on {len(batch)} generation logs after {attempt} attempts: {error}")
+                return
+            delay = min(self.retry_backoff * 2 ** (attempt - 1), self.max_backoff)
+            if remaining is not None:
+                delay = min(delay, remaining)
+            print(f"Failed to write {len(batch)} generation logs (attempt {attempt}), retrying in {delay:.1f}s: {error}")
+            time.sleep(delay)
+
+    def _write(self, batch):
+        """Commits one batch; returns the exception instead of raising so callers can retry or split."""
+        db = self.session_factory()
+        try:
+            # Before the INSERTs, so a concurrent rollup backfill sees this batch entirely or not at all
+            lock_rollups(db)
+            db.add_all(batch)
+            # Usage rollups move in the same transaction as the rows they count
+            record_usage(db, batch)
+            db.commit()
+        except Exception as e:
+            # Rollback expunges the pending rows, so they can be added to a new session
+            db.rollback()
+            return e
+        finally:
+            db.close()
+        self._bump("rows", len(batch))
+        self._bump("transactions")
+        return None
+
+    def _bump(self, key: str, n: int = 1):
+        with self._stats_lock:
+            self.stats[key] += n
+
+
+log_writer = LogWriter(
+    batch_size=settings.LOG_WRITER_BATCH_SIZE,
+    flush_interval=settings.LOG_WRITER_FLUSH_INTERVAL,
+    max_queue=settings.LOG_WRITER_MAX_QUEUE,
+    max_retries=settings.LOG_WRITER_MAX_RETRIES,
+    retry_backoff=settings.LOG_WRITER_RETRY_BACKOFF,
+    max_backoff=settings.LOG_WRITER_MAX_BACKOFF,
+)
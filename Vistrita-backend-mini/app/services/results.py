@@ -0,0 +1,7 @@
+"""Helpers for generated results that must not pull in the Gemini client."""
+
+
+def is_fallback_result(result: dict) -> bool:
+    """True for the placeholder content returned when Gemini fails (titles: ["Error..."])."""
+    titles = result.get("titles")
+    return bool(titles) and str(titles[0]).startswith("Error")
@@ -0,0 +1,201 @@
+"""
+Partition maintenance and retention for ``product_descriptions`` (Postgres only).
+
+The table is range-partitioned by ``created_at`` into monthly partitions named
+``product_descriptions_pYYYYMM`` plus a ``product_descriptions_default`` catch-all
+(rows that land there are moved into their own month's partition on the next run).
+Partitions older than the retention window are exported to gzip-compressed CSV
+in ``ARCHIVE_DIR`` (cold storage) and then detached and dropped.
+
+Run periodically (e.g. daily cron):
+    python -m app.services.retention
+"""
+import argparse
+import gzip
+import os
+import re
+from datetime import date
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.database import engine as default_engine
+
+PARENT = "product_descriptions"
+_PARTITION_RE = re.compile(rf"^{PARENT}_p(\d{{4}})(\d{{2}})$")
+PARTITION_LOCK_KEY = 0x56495355  # arbitrary app-wide id for pg_advisory_xact_lock
+
+
+def _lock_maintenance(conn):
+    """
+    Serialises partition DDL across processes (every API worker runs
+    ensure_partitions at startup, the retention job may run alongside) until
+    the end of the transaction. Existence checks must come after this.
+    """
+    conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": PARTITION_LOCK_KEY})
+
+
+def _add_months(d: date, months: int) -> date:
+    total = d.year * 12 + (d.month - 1) + months
+    return date(total // 12, total % 12 + 1, 1)
+
+
+def _is_partitioned(conn) -> bool:
+    relkind = conn.execute(
+        text("SELECT relkind FROM pg_class WHERE relname = :name AND relkind IN ('r', 'p')"),
+        {"name": PARENT},
+    ).scalar()
+    return relkind == "p"
+
+
+def _partitions(conn):
+    return conn.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :name ORDER BY c.relname"
+        ),
+        {"name": PARENT},
+    ).scalars().all()
+
+
+def _default_months(conn):
+    """Month starts that have rows sitting in the default partition."""
+    return conn.execute(text(
+        f"SELECT DISTINCT date_trunc('month', created_at)::date FROM {PARENT}_default ORDER BY 1"
+    )).scalars().all()
+
+
+def _create_partition(engine, start: date):
+    """
+    Creates the monthly partition starting at ``start``. Postgres refuses to
+    create it while the default partition holds rows in its range, so those
+    rows are moved in the same transaction: take them out of the default
+    partition, create the month, put them back (now routed to the month).
+    Writers wait on the parent's lock meanwhile rather than failing.
+    """
+    end = _add_months(start, 1)
+    name = f"{PARENT}_p{start:%Y%m}"
+    bounds = {"start": start, "end": end}
+
+    with engine.begin() as conn:
+        _lock_maintenance(conn)
+        if conn.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is not None:
+            return
+        conn.execute(text(f"LOCK TABLE {PARENT} IN SHARE ROW EXCLUSIVE MODE"))
+        conn.execute(text(f"CREATE TEMP TABLE stranded_rows (LIKE {PARENT}) ON COMMIT DROP"))
+        moved = conn.execute(text(
+            f"WITH moved AS (DELETE FROM {PARENT}_default "
+            f"WHERE created_at >= :start AND created_at < :end RETURNING *) "
+            f"INSERT INTO stranded_rows SELECT * FROM moved"
+        ), bounds).rowcount
+        conn.execute(text(
+            f"CREATE TABLE {name} PARTITION OF {PARENT} "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        ))
+        if moved:
+            conn.execute(text(f"INSERT INTO {name} SELECT * FROM stranded_rows"))
+            print(f"Moved {moved} rows from {PARENT}_default into {name}")
+
+
+def _partition_default_rows(engine):
+    """Gives every month with rows in the default partition its own partition (moving the rows)."""
+    with engine.connect() as conn:
+        months = _default_months(conn)
+    for start in months:
+        _create_partition(engine, start)
+
+
+def ensure_partitions(engine=default_engine, months_ahead: int = None, today: date = None):
+    """
+    Creates the default partition and monthly partitions from last month up to
+    ``months_ahead`` months in the future, plus one for any other month whose
+    rows ended up in the default partition. Safe to run repeatedly.
+    """
+    if engine.dialect.name != "postgresql":
+        return
+    months_ahead = settings.PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+    current = (today or date.today()).replace(day=1)
+
+    with engine.begin() as conn:
+        _lock_maintenance(conn)
+        if not _is_partitioned(conn):
+            print(f"{PARENT} is not partitioned; run migrations/001_compact_product_descriptions.sql")
+            return
+        conn.execute(text(f"CREATE TABLE IF NOT EXISTS {PARENT}_default PARTITION OF {PARENT} DEFAULT"))
+        months = set(_default_months(conn))
+
+    months.update(_add_months(current, offset) for offset in range(-1, months_ahead + 1))
+    for start in sorted(months):
+        try:
+            _create_partition(engine, start)
+        except Exception as e:
+            print(f"Could not create partition {PARENT}_p{start:%Y%m}: {e}")
+
+
+def archive_partitions(engine=default_engine, retention_months: int = None, archive_dir: str = None, today: date = None):
+    """
+    Exports every monthly partition that ends before the retention cutoff to
+    ``<archive_dir>/<partition>.csv.gz``, then detaches and drops it. Rows that
+    landed in the default partition are moved into monthly partitions first,
+    so they expire with their month.
+    Returns the list of archived partition names.
+    """
+    if engine.dialect.name != "postgresql":
+        return []
+    retention_months = settings.RETENTION_MONTHS if retention_months is None else retention_months
+    archive_dir = archive_dir or settings.ARCHIVE_DIR
+    cutoff = _add_months((today or date.today()).replace(day=1), -retention_months)
+    _partition_default_rows(engine)
+
+    with engine.connect() as conn:
+        expired = []
+        for name in _partitions(conn):
+            match = _PARTITION_RE.match(name)
+            if match and _add_months(date(int(match[1]), int(match[2]), 1), 1) <= cutoff:
+                expired.append(name)
+
+    os.makedirs(archive_dir, exist_ok=True)
+    archived = []
+    for name in expired:
+        path = os.path.join(archive_dir, f"{name}.csv.gz")
+        tmp_path = path + ".tmp"
+
+        # The partition's range is in the past, so its rows can no longer change
+        raw = engine.raw_connection()
+        try:
+            with gzip.open(tmp_path, "wb") as f:
+                cursor = raw.cursor()
+                cursor.copy_expert(f"COPY {name} TO STDOUT WITH (FORMAT csv, HEADER)", f)
+                cursor.close()
+            raw.commit()
+        finally:
+            raw.close()
+        os.replace(tmp_path, path)
+
+        with engine.begin() as conn:
+            _lock_maintenance(conn)
+            if conn.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is None:
+                continue  # archived by a concurrent run
+            conn.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {name}"))
+            conn.execute(text(f"DROP TABLE {name}"))
+        archived.append(name)
+        print(f"Archived {name} -> {path}")
+
+    return archived
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain product_descriptions partitions.")
+    parser.add_argument("--retention-months", type=int, default=settings.RETENTION_MONTHS)
+    parser.add_argument("--months-ahead", type=int, default=settings.PARTITION_MONTHS_AHEAD)
+    parser.add_argument("--archive-dir", default=settings.ARCHIVE_DIR)
+    args = parser.parse_args()
+
+    ensure_partitions(months_ahead=args.months_ahead)
+    archive_partitions(retention_months=args.retention_months, archive_dir=args.archive_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+import difflib
+import json
+import os
+import re
+import threading
+import zlib
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.schemas.product import GenerateRequest
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_ROW_RECORD = np.dtype([("offset", np.int64), ("user_id", np.int64)])
+
+
+def product_text(data: GenerateRequest) -> str:
+    """Flattens the generator inputs into the text we embed."""
+    return " ".join([data.title, data.category] + list(data.features or []))
+
+
+def _tokens(text: str) -> List[str]:
+    words = _TOKEN_RE.findall(text.lower())
+    # Unigrams + bigrams so "red sneaker" and "sneaker red" don't look identical
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+class HashingVectorizer:
+    """
+    Stateless text embedding: signed feature hashing of word uni/bigrams into a
+    fixed number of buckets, L2 normalised so a dot product is cosine similarity.
+    """
+
+    def __init__(self, dim: int):
+        self.dim = dim
+
+    def transform(self, texts: List[str]) -> np.ndarray:
+        rows, cols, signs = [], [], []
+        for i, text in enumerate(texts):
+            for token in _tokens(text):
+                # crc32 (not hash()) so vectors are stable across processes/restarts
+                h = zlib.crc32(token.encode("utf-8"))
+                rows.append(i)
+                cols.append(h % self.dim)
+                signs.append(1.0 if h & 0x80000000 else -1.0)
+
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        np.add.at(matrix, (rows, cols), signs)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+
+@dataclass
+class Match:
+    score: float
+    entry: dict
+
+
+_NO_USER = -1  # owner id stored for generations made outside a user request (scripts, benchmarks)
+
+
+class SimilarityIndex:
+    """
+    Append-only, per-user vector index over past generations, shared safely by
+    every worker process that points at the same directory.
+
+    Files:
+      * ``payloads.jsonl``      inputs/outputs, one JSON line per row (read only for matches)
+      * ``rows.bin``            one ``(payload offset, user id)`` int64 pair per row
+      * ``vectors-<dim>.f32``   raw float32 vectors, grown in place (never replaced)
+
+    Appends happen under an exclusive ``flock`` on ``index.lock`` and write the
+    vector and payload before the ``rows.bin`` record, so that record is the
+    commit point: readers derive the row count from its size and never see a
+    half-written row. Searches map the files afresh each time and need no lock.
+    """
+
+    def __init__(self, directory: str, dim: int, initial_capacity: int = 256):
+        self.directory = directory
+        self.vectorizer = HashingVectorizer(dim)
+        self.initial_capacity = initial_capacity
+        self._row_bytes = dim * 4
+        self._vectors_path = os.path.join(directory, f"vectors-{dim}.f32")
+        self._rows_path = os.path.join(directory, "rows.bin")
+        self._payloads_path = os.path.join(directory, "payloads.jsonl")
+        self._lock_path = os.path.join(directory, "index.lock")
+        self._thread_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._count()
+
+    @contextmanager
+    def _locked(self):
+        with self._thread_lock:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self._lock_path, "a") as lock_file:
+                if fcntl is not None:  # no cross-process locking on Windows: run a single worker there
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                yield
+
+    def _size(self, path: str) -> int:
+        try:
+            return os.path.getsize(path)
+        except FileNotFoundError:
+            return 0
+
+    def _count(self) -> int:
+        # A torn trailing record (crash mid-append) is not counted
+        return self._size(self._rows_path) // _ROW_RECORD.itemsize
+
+    def _rows(self, count: int) -> np.ndarray:
+        return np.memmap(self._rows_path, dtype=_ROW_RECORD, mode="r", shape=(count,))
+
+    def _read_payloads(self, offsets) -> List[dict]:
+        with open(self._payloads_path, "rb") as f:
+            payloads = []
+            for offset in offsets:
+                f.seek(int(offset))
+                payloads.append(json.loads(f.readline()))
+            return payloads
+
+    def _write_vectors(self, start: int, vectors: np.ndarray):
+        """Writes rows ``start..`` of the vector file, extending it by doubling when needed."""
+        needed = start + len(vectors)
+        with open(self._vectors_path, "ab+") as f:
+            capacity = os.fstat(f.fileno()).st_size // self._row_bytes
+            if capacity < needed:
+                capacity = max(capacity, self.initial_capacity)
+                while capacity < needed:
+                    capacity *= 2
+                # Extending in place keeps other processes' existing mappings valid
+                f.truncate(capacity * self._row_bytes)
+        with open(self._vectors_path, "r+b") as f:
+            f.seek(start * self._row_bytes)
+            f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+
+    def _ensure_vectors(self, count: int):
+        """Re-embeds from the stored text when the vector file is missing or short (e.g. SIMILARITY_DIM changed)."""
+        if self._size(self._vectors_path) >= count * self._row_bytes:
+            return
+        with self._locked():
+            self._rebuild_vectors(self._count())
+
+    def _rebuild_vectors(self, count: int, chunk_size: int = 1024):
+        # Caller holds the index lock
+        if self._size(self._vectors_path) >= count * self._row_bytes:
+            return
+        rows = self._rows(count)
+        for start in range(0, count, chunk_size):
+            payloads = self._read_payloads(rows["offset"][start : start + chunk_size])
+            self._write_vectors(start, self.vectorizer.transform([p["text"] for p in payloads]))
+
+    def add(self, data: GenerateRequest, result: dict, user_id: Optional[int] = None):
+        """Index a single successful generation for ``user_id``."""
+        self.add_many([(data, result)], user_id)
+
+    def add_many(self, items, user_id: Optional[int] = None):
+        """Index a batch of ``(GenerateRequest, result)`` pairs with one embedding pass."""
+        if not items:
+            return
+        entries = [
+            {
+                "text": product_text(data),
+                "title": data.title,
+                "category": data.category,
+                "features": list(data.features or []),
+                "tone": data.tone,
+                "result": result,
+            }
+            for data, result in items
+        ]
+        vectors = self.vectorizer.transform([e["text"] for e in entries])
+        owner = _NO_USER if user_id is None else user_id
+
+        with self._locked():
+            start = self._count()
+            self._rebuild_vectors(start)
+            self._write_vectors(start, vectors)
+
+            records = np.zeros(len(entries), dtype=_ROW_RECORD)
+            with open(self._payloads_path, "ab") as f:
+                for i, entry in enumerate(entries):
+                    records[i] = (f.tell(), owner)
+                    f.write(json.dumps(entry).encode("utf-8") + b"\n")
+            with open(self._rows_path, "r+b" if os.path.exists(self._rows_path) else "wb") as f:
+                f.truncate(start * _ROW_RECORD.itemsize)  # drop a torn record, if any
+                f.seek(start * _ROW_RECORD.itemsize)
+                f.write(records.tobytes())
+
+    def search(self, queries: List[GenerateRequest], k: int = 3, user_id: Optional[int] = None) -> List[List[Match]]:
+        """
+        Batched cosine search over ``user_id``'s own rows: returns the top ``k``
+        matches (best first) for every query in one matrix product.
+        """
+        empty = [[] for _ in queries]
+        count = self._count()
+        if count == 0:
+            return empty
+        self._ensure_vectors(count)
+
+        rows = self._rows(count)
+        owner = _NO_USER if user_id is None else user_id
+        candidates = np.flatnonzero(rows["user_id"] == owner)
+        if candidates.size == 0:
+            return empty
+
+        query_vectors = self.vectorizer.transform([product_text(q) for q in queries])
+        vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(count, self.vectorizer.dim))
+        scores = query_vectors @ vectors[candidates].T
+
+        k = min(k, candidates.size)
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        ordered = [cols[np.argsort(-row[cols])] for row, cols in zip(scores, top)]
+
+        # Only the matched payloads are read from disk
+        wanted = sorted({int(candidates[c]) for cols in ordered for c in cols})
+        payloads = dict(zip(wanted, self._read_payloads(rows["offset"][wanted])))
+        return [
+            [Match(score=float(row[c]), entry=payloads[int(candidates[c])]) for c in cols]
+            for row, cols in zip(scores, ordered)
+        ]
+
+
+def title_similarity(a: str, b: str) -> float:
+    """Word-level overlap of two titles (difflib ratio, 0..1), ignoring case and punctuation."""
+    return difflib.SequenceMatcher(None, _TOKEN_RE.findall(a.lower()), _TOKEN_RE.findall(b.lower())).ratio()
+
+
+def _normalized_features(features) -> List[str]:
+    return sorted(f.strip().lower() for f in features or [])
+
+
+def same_inputs(entry: dict, data: GenerateRequest) -> bool:
+    """True when a stored generation had the same tone, category and feature list as ``data``."""
+    return (
+        entry["tone"] == data.tone
+        and entry["category"].lower() == data.category.lower()
+        and _normalized_features(entry.get("features")) == _normalized_features(data.features)
+    )
+
+
+def _match_case(original: str, replacement: str) -> str:
+    if original.isupper() and len(original) > 1:
+        return replacement.upper()
+    if original[:1].isupper():
+        return replacement[:1].upper() + replacement[1:]
+    return replacement.lower()
+
+
+def adapt_result(match: Match, data: GenerateRequest) -> dict:
+    """
+    Re-targets a near-identical prior result at the new product: the old title
+    is swapped for the new one, and when both titles have the same number of
+    words, each differing word too ("Red Sneaker" -> "Crimson Sneaker" turns a
+    stray "red" into "crimson"). Only whole words are replaced.
+    """
+    old_title, new_title = match.entry["title"], data.title
+    replacements = {old_title.lower(): new_title}
+    old_words, new_words = old_title.split(), new_title.split()
+    if len(old_words) == len(new_words):
+        for old, new in zip(old_words, new_words):
+            if old.lower() != new.lower():
+                replacements.setdefault(old.lower(), new)
+
+    # Longest first so the full title wins over its individual words
+    alternatives = sorted(replacements, key=len, reverse=True)
+    pattern = re.compile(r"(?<!\w)(" + "|".join(map(re.escape, alternatives)) + r")(?!\w)", re.IGNORECASE)
+
+    def replace(m):
+        key = m.group(0).lower()
+        if key == old_title.lower():
+            return new_title
+        return _match_case(m.group(0), replacements[key])
+
+    def swap(value):
+        if isinstance(value, str):
+            return pattern.sub(replace, value)
+        if isinstance(value, list):
+            return [swap(v) for v in value]
+        return value
+
+    return {key: swap(value) for key, value in match.entry["result"].items()}
+
+
+similarity_index = SimilarityIndex(settings.SIMILARITY_INDEX_DIR, settings.SIMILARITY_DIM)
@@ -3,6 +3,7 @@ import json
 from google import genai
 from google.genai import types
 from app.core.config import settings
+from app.core.admission import upstream_health
 from app.schemas.product import VisionRequest
 
 client = genai.Client(api_key=settings.GOOGLE_API_KEY)
@@ -51,7 +52,7 @@ def extract_attributes_from_image(data: VisionRequest) -> dict:
 
     # 3. Call Gemini (Multimodal)
     try:
-        response = client.models.generate_content(
+        response = upstream_health.call(client.models.generate_content,
             model="gemini-2.0-flash-lite",
             contents=[
                 types.Content(
@@ -0,0 +1,96 @@
+"""
+Serialization CPU and bytes on the wire for the large responses
+(/history/logs, /generator/generate/bulk), no database or Gemini needed.
+
+  * default:  response_model validation + jsonable_encoder + JSONResponse (what FastAPI did)
+  * fast:     orjson.dumps of the dicts we already have (app.core.responses.json_response)
+
+Usage (from Vistrita-backend-mini/):
+    python -m benchmarks.bench_responses --rows 500 --repeat 50
+"""
+import argparse
+import gzip
+import time
+from datetime import datetime, timezone
+from typing import List
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from app.core.config import settings
+from app.schemas.product import BulkGenerateResponse
+from app.schemas.product_log import ProductLog
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def make_result(i: int) -> dict:
+    return {
+        "titles": [f"Wireless Noise Cancelling Headphones {i}", f"Studio ANC Headphones {i}", f"Travel Headphones {i}"],
+        "description_short": "Immersive sound with all-day comfort and adaptive noise cancellation.",
+        "description_long": "Block out the world with adaptive noise cancellation and studio-grade drivers. " * 6,
+        "bullets": ["Active Noise Cancellation", "20h Battery", "Bluetooth 5.0", "Foldable design"],
+        "warnings": [],
+        "keywords": ["headphones", "anc", "wireless", "bluetooth", "travel"],
+    }
+
+
+def make_log(i: int) -> dict:
+    result = make_result(i)
+    return {
+        "id": i,
+        "product_name": f"Headphones {i}",
+        "category": "Electronics",
+        "tone": "neutral",
+        "description": result["description_long"],
+        **result,
+        "created_at": datetime(2026, 1, 1, tzinfo=timezone.utc),
+        "user_id": 1,
+    }
+
+
+def timed(fn, repeat: int):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        body = fn()
+    return (time.perf_counter() - start) * 1000 / repeat, body
+
+
+def report(name: str, payload, adapter: TypeAdapter, repeat: int):
+    default_ms, default_body = timed(
+        lambda: JSONResponse(jsonable_encoder(adapter.validate_python(payload))).body, repeat
+    )
+    fast_ms, fast_body = timed(lambda: orjson.dumps(payload), repeat)
+    gzip_ms, gzip_body = timed(lambda: gzip.compress(fast_body, compresslevel=settings.RESPONSE_GZIP_LEVEL), repeat)
+
+    print(f"{name}")
+    print(f"  default encode:  {default_ms:8.2f} ms   {len(default_body):>9} bytes")
+    print(f"  orjson encode:   {fast_ms:8.2f} ms   {len(fast_body):>9} bytes   ({default_ms / fast_ms:.1f}x faster)")
+    print(f"  + gzip:          {gzip_ms:8.2f} ms   {len(gzip_body):>9} bytes")
+    if brotli is not None:
+        br_ms, br_body = timed(lambda: brotli.compress(fast_body, quality=settings.RESPONSE_BROTLI_QUALITY), repeat)
+        print(f"  + brotli:        {br_ms:8.2f} ms   {len(br_body):>9} bytes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500, help="history rows / bulk products per response")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    history = [make_log(i) for i in range(args.rows)]
+    bulk = {
+        "results": [make_result(i) for i in range(args.rows)],
+        "metrics": {"total": args.rows, "successful": args.rows, "failed": 0},
+    }
+    report(f"/history/logs ({args.rows} rows)", history, TypeAdapter(List[ProductLog]), args.repeat)
+    report(f"/generator/generate/bulk ({args.rows} products)", bulk, TypeAdapter(BulkGenerateResponse), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Measures product_descriptions on-disk size and history-query latency (Postgres).
+
+Works on both the legacy layout and the partitioned one, so the intended use is:
+    python -m benchmarks.bench_storage --seed 200000      # legacy schema: seed + measure
+    psql "$DATABASE_URL" -f migrations/001_compact_product_descriptions.sql
+    python -m benchmarks.bench_storage                    # same rows, new layout
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine, text
+
+from app.core.config import settings
+
+LONG = "Block out the world with adaptive noise cancellation and studio-grade drivers. " * 10
+
+
+def seed(engine, rows: int, users: int, months: int):
+    with engine.begin() as conn:
+        columns = set(conn.execute(text(
+            "SELECT column_name FROM information_schema.columns WHERE table_name = 'product_descriptions'"
+        )).scalars())
+        user_ids = []
+        for i in range(users):
+            email = f"bench{i}@vistrita.local"
+            conn.execute(text(
+                "INSERT INTO users (email, hashed_password, is_active) VALUES (:e, 'x', true) "
+                "ON CONFLICT (email) DO NOTHING"
+            ), {"e": email})
+            user_ids.append(conn.execute(text("SELECT id FROM users WHERE email = :e"), {"e": email}).scalar())
+
+    # The legacy layout stores the long text twice
+    names = ["product_name", "category", "tone", "titles", "description_short", "description_long",
+             "bullets", "warnings", "keywords", "user_id", "created_at"]
+    if "description" in columns:
+        names.append("description")
+    insert = text(f"INSERT INTO product_descriptions ({', '.join(names)}) VALUES ({', '.join(':' + n for n in names)})")
+
+    now = datetime.now(timezone.utc)
+    rng = random.Random(0)
+    batch = []
+    for i in range(rows):
+        row = {
+            "product_name": f"Product {i}",
+            "category": rng.choice(["Electronics", "Footwear", "Kitchen", "Apparel"]),
+            "tone": rng.choice(["neutral", "luxury", "playful"]),
+            "titles": json.dumps([f"Product {i} Title A", f"Product {i} Title B"]),
+            "description_short": "Immersive sound with all-day comfort.",
+            "description_long": LONG,
+            "bullets": json.dumps(["Active Noise Cancellation", "20h Battery", "Bluetooth 5.0"]),
+            "warnings": json.dumps([]),
+            "keywords": json.dumps(["headphones", "anc", "wireless"]),
+            "user_id": rng.choice(user_ids),
+            "created_at": now - timedelta(seconds=rng.randrange(months * 30 * 86400)),
+            "description": LONG,
+        }
+        batch.append(row)
+        if len(batch) == 5000 or i == rows - 1:
+            with engine.begin() as conn:
+                conn.execute(insert, batch)
+            batch = []
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE product_descriptions"))
+
+
+def table_size(engine) -> int:
+    with engine.connect() as conn:
+        # pg_partition_tree() is empty for a plain (legacy) table
+        return conn.execute(text(
+            "SELECT COALESCE("
+            "(SELECT sum(pg_total_relation_size(relid)) FROM pg_partition_tree('product_descriptions')), "
+            "pg_total_relation_size('product_descriptions'))"
+        )).scalar()
+
+
+def history_latency(engine, queries: int):
+    with engine.connect() as conn:
+        user_ids = conn.execute(text("SELECT DISTINCT user_id FROM product_descriptions")).scalars().all()
+        # Same query as GET /history/logs
+        query = text("SELECT * FROM product_descriptions WHERE user_id = :u ORDER BY created_at DESC")
+        timings = []
+        for i in range(queries):
+            start = time.perf_counter()
+            conn.execute(query, {"u": user_ids[i % len(user_ids)]}).fetchall()
+            timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.95) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=settings.DATABASE_URL)
+    parser.add_argument("--seed", type=int, default=0, help="insert this many synthetic rows first")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--months", type=int, default=12, help="spread seeded rows over this many months")
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    if args.seed:
+        seed(engine, args.seed, args.users, args.months)
+
+    with engine.connect() as conn:
+        rows = conn.execute(text("SELECT count(*) FROM product_descriptions")).scalar()
+    p50, p95 = history_latency(engine, args.queries)
+    print(f"rows:            {rows}")
+    print(f"table size:      {table_size(engine) / 1024 / 1024:.1f} MiB (heap + indexes + TOAST, all partitions)")
+    print(f"history query:   p50 {p50:.2f} ms   p95 {p95:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Batched multi-tone/multi-variant Gemini requests vs. the equivalent N sequential
+/generate calls (wall time and token usage). Needs GOOGLE_API_KEY and GEMINI_MODEL.
+
+Usage (from Vistrita-backend-mini/):
+    python -m benchmarks.bench_variants --tones neutral luxury playful --variants 2 --rounds 3
+"""
+import argparse
+import os
+import tempfile
+import time
+
+# Keep the similarity index out of the measurement: no reuse, no few-shot, throwaway storage
+os.environ["SIMILARITY_TITLE_REUSE_THRESHOLD"] = "2"
+os.environ["SIMILARITY_FEWSHOT_THRESHOLD"] = "2"
+os.environ["SIMILARITY_INDEX_DIR"] = tempfile.mkdtemp(prefix="bench_variants_")
+
+from app.schemas.product import GenerateRequest, GenerateVariantsRequest  # noqa: E402
+from app.services import generator  # noqa: E402
+
+usage = {"calls": 0, "prompt_tokens": 0, "output_tokens": 0}
+_generate_content = generator.client.models.generate_content
+
+
+def _counting_generate_content(**kwargs):
+    response = _generate_content(**kwargs)
+    usage["calls"] += 1
+    meta = getattr(response, "usage_metadata", None)
+    if meta is not None:
+        usage["prompt_tokens"] += meta.prompt_token_count or 0
+        usage["output_tokens"] += meta.candidates_token_count or 0
+    return response
+
+
+generator.client.models.generate_content = _counting_generate_content
+
+
+def measure(fn, rounds: int) -> dict:
+    usage.update(calls=0, prompt_tokens=0, output_tokens=0)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    elapsed = (time.perf_counter() - start) / rounds
+    return {"seconds": elapsed, **{k: v / rounds for k, v in usage.items()}}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tones", nargs="+", default=["neutral", "luxury", "playful"])
+    parser.add_argument("--variants", type=int, default=1)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    product = {
+        "title": "Wireless Noise Cancelling Headphones",
+        "category": "Electronics",
+        "features": ["Active Noise Cancellation", "20h Battery", "Bluetooth 5.0"],
+    }
+
+    def sequential():
+        for tone in args.tones:
+            for _ in range(args.variants):
+                generator.generate_product_description(GenerateRequest(**product, tone=tone))
+
+    def batched():
+        generator.generate_product_variants(
+            GenerateVariantsRequest(**product, tones=args.tones, variants=args.variants)
+        )
+
+    n = len(args.tones) * args.variants
+    rows = [(f"{n} sequential calls", measure(sequential, args.rounds)),
+            ("multi-output calls", measure(batched, args.rounds))]
+
+    print(f"{'':22} {'wall s':>8} {'calls':>6} {'prompt tok':>11} {'output tok':>11}")
+    for name, r in rows:
+        print(f"{name:22} {r['seconds']:8.2f} {r['calls']:6.0f} {r['prompt_tokens']:11.0f} {r['output_tokens']:11.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+-- Compact layout for product_descriptions (PostgreSQL)
+--
+--   * drops the `description` column (it always duplicated description_long)
+--   * JSON -> JSONB for titles/bullets/warnings/keywords
+--   * replaces the single-column indexes with (user_id, created_at)
+--   * range-partitions the table by month on created_at
+--
+-- Run once against an existing database, with the API stopped:
+--   psql "$DATABASE_URL" -f migrations/001_compact_product_descriptions.sql
+-- Fresh databases get this layout from Base.metadata.create_all() and do not need it.
+
+BEGIN;
+
+ALTER TABLE product_descriptions RENAME TO product_descriptions_legacy;
+ALTER TABLE product_descriptions_legacy RENAME CONSTRAINT product_descriptions_pkey TO product_descriptions_legacy_pkey;
+ALTER TABLE product_descriptions_legacy RENAME CONSTRAINT product_descriptions_user_id_fkey TO product_descriptions_legacy_user_id_fkey;
+ALTER SEQUENCE product_descriptions_id_seq RENAME TO product_descriptions_legacy_id_seq;
+DROP INDEX IF EXISTS ix_product_descriptions_id;
+DROP INDEX IF EXISTS ix_product_descriptions_product_name;
+DROP INDEX IF EXISTS ix_product_descriptions_category;
+
+CREATE TABLE product_descriptions (
+    id SERIAL NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+    product_name VARCHAR,
+    category VARCHAR,
+    tone VARCHAR,
+    titles JSONB,
+    description_short TEXT,
+    description_long TEXT,
+    bullets JSONB,
+    warnings JSONB,
+    keywords JSONB,
+    user_id INTEGER,
+    PRIMARY KEY (id, created_at),
+    FOREIGN KEY (user_id) REFERENCES users (id)
+) PARTITION BY RANGE (created_at);
+
+CREATE INDEX ix_product_descriptions_user_created ON product_descriptions (user_id, created_at);
+CREATE TABLE product_descriptions_default PARTITION OF product_descriptions DEFAULT;
+
+-- One partition per month from the oldest row up to 3 months ahead
+-- (same naming as app/services/retention.py)
+DO $$
+DECLARE
+    month_start date := date_trunc('month', COALESCE((SELECT min(created_at) FROM product_descriptions_legacy), now()));
+    last_month date := date_trunc('month', now() + interval '3 months');
+BEGIN
+    WHILE month_start <= last_month LOOP
+        EXECUTE format(
+            'CREATE TABLE product_descriptions_p%s PARTITION OF product_descriptions FOR VALUES FROM (%L) TO (%L)',
+            to_char(month_start, 'YYYYMM'), month_start, (month_start + interval '1 month')::date
+        );
+        month_start := (month_start + interval '1 month')::date;
+    END LOOP;
+END $$;
+
+INSERT INTO product_descriptions (
+    id, created_at, product_name, category, tone, titles, description_short,
+    description_long, bullets, warnings, keywords, user_id
+)
+SELECT
+    id,
+    COALESCE(created_at, now()),
+    product_name,
+    category,
+    tone,
+    titles::jsonb,
+    description_short,
+    COALESCE(NULLIF(description_long, ''), description),
+    bullets::jsonb,
+    warnings::jsonb,
+    keywords::jsonb,
+    user_id
+FROM product_descriptions_legacy;
+
+SELECT setval(
+    pg_get_serial_sequence('product_descriptions', 'id'),
+    COALESCE((SELECT max(id) FROM product_descriptions), 0) + 1,
+    false
+);
+
+DROP TABLE product_descriptions_legacy;
+
+COMMIT;
+
+ANALYZE product_descriptions;